@@ -1,3 +1,5 @@
+import json
+import os
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from ttkbootstrap import Style
@@ -21,9 +23,39 @@ class ImageCropper(tk.Toplevel):
     # 控制點大小
     HANDLE_SIZE = 8
 
-    def __init__(self, master, imagePath):
+    # 批次匯出的預設目標解析度 (寬, 高)，可由建構子參數覆寫
+    TARGET_RESOLUTIONS = [
+        (1280, 720),
+        (1600, 900),
+        (1920, 1080),
+        (2560, 1440),
+        (3840, 2160),
+    ]
+
+    # 判定來源與目標長寬比相同的容許誤差
+    ASPECT_TOLERANCE = 0.01
+
+    def __init__(self, master, imagePath, targetResolutions=None):
+        # 先檢查目標解析度，避免開啟視窗後才在按鈕事件中出錯
+        if targetResolutions is None:
+            targetResolutions = self.TARGET_RESOLUTIONS
+        targetResolutions = list(targetResolutions)
+
+        for resolution in targetResolutions:
+            if not (
+                isinstance(resolution, (tuple, list))
+                and len(resolution) == 2
+                and all(
+                    isinstance(value, int) and not isinstance(value, bool) and value > 0
+                    for value in resolution
+                )
+            ):
+                raise ValueError(f"目標解析度必須為 (寬, 高) 正整數：{resolution!r}")
+
         super().__init__(master)
 
+        self.targetResolutions = [tuple(resolution) for resolution in targetResolutions]
+
         # 初始化基本設定
         self._initializeWindow()
         self._loadImage(imagePath)
@@ -56,6 +88,7 @@ class ImageCropper(tk.Toplevel):
 
     def _loadImage(self, imagePath):
         """載入圖片"""
+        self.imagePath = imagePath
         self.originalImage = Image.open(imagePath)
         self.scale = 1.0
 
@@ -187,7 +220,50 @@ class ImageCropper(tk.Toplevel):
             style="primary.Outline.TButton",
             command=self.getOriginalCoordinates,
         )
-        getCoordinatesButton.pack(padx=(0, 0), side="left")
+        getCoordinatesButton.pack(padx=(0, 12), side="left")
+
+        exportVariantsButton = ttk.Button(
+            buttonContainer,
+            text="匯出多解析度",
+            style="primary.Outline.TButton",
+            command=self.exportResolutionVariants,
+        )
+        exportVariantsButton.pack(padx=(0, 0), side="left")
+
+    def _getOriginalSelection(self):
+        """取得選取區域在原圖上的座標 (x1, y1, x2, y2)"""
+        x1, y1, x2, y2 = map(int, self.rectangleCoordinates)
+        x1, x2 = sorted([x1, x2])
+        y1, y2 = sorted([y1, y2])
+        factor = 1 / self.scale
+
+        # 限制座標不超出原圖範圍
+        width, height = self.originalImage.size
+        return (
+            max(0, min(int(x1 * factor), width)),
+            max(0, min(int(y1 * factor), height)),
+            max(0, min(int(x2 * factor), width)),
+            max(0, min(int(y2 * factor), height)),
+        )
+
+    def _hasSelection(self):
+        """檢查是否有非空的選取區域"""
+        if not self.rectangleCoordinates:
+            return False
+
+        x1, y1, x2, y2 = self._getOriginalSelection()
+        return x1 < x2 and y1 < y2
+
+    def _getNormalizedSelection(self):
+        """取得選取區域的正規化座標 (0 ~ 1)，與原圖解析度無關"""
+        width, height = self.originalImage.size
+        x1, y1, x2, y2 = self._getOriginalSelection()
+        return (
+            round(x1 / width, 6),
+            round(y1 / height, 6),
+            round(x2 / width, 6),
+            round(y2 / height, 6),
+        )
 
     def _updateCoordinateDisplay(self):
         """更新座標顯示"""
@@ -197,14 +273,7 @@ class ImageCropper(tk.Toplevel):
             self.coordinateEntry.config(state="readonly")
             return
 
-        x1, y1, x2, y2 = map(int, self.rectangleCoordinates)
-        x1, x2 = sorted([x1, x2])
-        y1, y2 = sorted([y1, y2])
-        factor = 1 / self.scale
-        originalX1 = int(x1 * factor)
-        originalY1 = int(y1 * factor)
-        originalX2 = int(x2 * factor)
-        originalY2 = int(y2 * factor)
+        originalX1, originalY1, originalX2, originalY2 = self._getOriginalSelection()
 
         coordinateText = f"({originalX1}, {originalY1}, {originalX2}, {originalY2})"
 
@@ -586,20 +655,11 @@ class ImageCropper(tk.Toplevel):
 
     def saveCroppedImage(self):
         """儲存裁切後的圖片"""
-        if not self.rectangleCoordinates:
+        if not self._hasSelection():
             messagebox.showwarning("警告", "尚未選取區域", parent=self)
             return
 
-        x1, y1, x2, y2 = map(int, self.rectangleCoordinates)
-        x1, x2 = sorted([x1, x2])
-        y1, y2 = sorted([y1, y2])
-        factor = 1 / self.scale
-        originalCoordinates = (
-            int(x1 * factor),
-            int(y1 * factor),
-            int(x2 * factor),
-            int(y2 * factor),
-        )
+        originalCoordinates = self._getOriginalSelection()
 
         croppedImage = self.originalImage.crop(originalCoordinates)
         savePath = filedialog.asksaveasfilename(
@@ -614,31 +674,185 @@ class ImageCropper(tk.Toplevel):
 
     def getOriginalCoordinates(self):
         """取得原圖座標並複製到剪貼簿"""
-        if not self.rectangleCoordinates:
+        if not self._hasSelection():
             messagebox.showinfo("提示", "尚未選取區域", parent=self)
             return
 
-        x1, y1, x2, y2 = map(int, self.rectangleCoordinates)
-        x1, x2 = sorted([x1, x2])
-        y1, y2 = sorted([y1, y2])
-        factor = 1 / self.scale
-        originalX1 = int(x1 * factor)
-        originalY1 = int(y1 * factor)
-        originalX2 = int(x2 * factor)
-        originalY2 = int(y2 * factor)
+        originalX1, originalY1, originalX2, originalY2 = self._getOriginalSelection()
+        normalizedX1, normalizedY1, normalizedX2, normalizedY2 = (
+            self._getNormalizedSelection()
+        )
 
         coordinateText = f"({originalX1}, {originalY1}, {originalX2}, {originalY2})"
+        normalizedText = (
+            f"({normalizedX1}, {normalizedY1}, {normalizedX2}, {normalizedY2})"
+        )
 
+        # 剪貼簿只放原圖座標，維持可直接貼上的格式
         self.clipboard_clear()
         self.clipboard_append(coordinateText)
         self.update()
 
         messagebox.showinfo(
-            "完成", f"座標已複製到剪貼簿\n{coordinateText}", parent=self
+            "完成",
+            f"座標已複製到剪貼簿\n原圖座標：{coordinateText}\n正規化座標：{normalizedText}",
+            parent=self,
+        )
+
+    def _isSameAspect(self, width, height):
+        """檢查解析度是否與原圖長寬比相同"""
+        sourceWidth, sourceHeight = self.originalImage.size
+        return (
+            abs(width / height - sourceWidth / sourceHeight) <= self.ASPECT_TOLERANCE
+        )
+
+    def exportResolutionVariants(self):
+        """依目標解析度批次匯出模板圖片與座標設定檔"""
+        if not self._hasSelection():
+            messagebox.showwarning("警告", "尚未選取區域", parent=self)
+            return
+
+        sourceWidth, sourceHeight = self.originalImage.size
+
+        # 長寬比不同的解析度會造成模板變形，不進行匯出
+        targetResolutions = []
+        skippedResolutions = []
+        for width, height in self.targetResolutions:
+            if self._isSameAspect(width, height):
+                targetResolutions.append((width, height))
+            else:
+                skippedResolutions.append(f"{width}x{height}")
+
+        if not targetResolutions:
+            messagebox.showwarning(
+                "警告",
+                f"原圖 {sourceWidth}x{sourceHeight} 與所有目標解析度的長寬比皆不同，"
+                "無法匯出",
+                parent=self,
+            )
+            return
+
+        if skippedResolutions and not messagebox.askyesno(
+            "確認",
+            f"以下解析度與原圖 {sourceWidth}x{sourceHeight} 長寬比不同，將略過：\n"
+            f"{', '.join(skippedResolutions)}\n\n是否繼續匯出其餘解析度？",
+            parent=self,
+        ):
+            return
+
+        # 放大後的模板較模糊，可能無法與原生高解析度畫面匹配
+        upscaledResolutions = [
+            f"{width}x{height}"
+            for width, height in targetResolutions
+            if height > sourceHeight
+        ]
+        if upscaledResolutions and not messagebox.askyesno(
+            "確認",
+            f"以下解析度大於原圖 {sourceWidth}x{sourceHeight}，模板將由原圖放大，"
+            f"可能較模糊：\n{', '.join(upscaledResolutions)}\n\n是否繼續匯出？",
+            parent=self,
+        ):
+            return
+
+        exportDirectory = filedialog.askdirectory(parent=self, title="選擇匯出資料夾")
+        if not exportDirectory:
+            return
+
+        originalCoordinates = self._getOriginalSelection()
+        normalizedCoordinates = self._getNormalizedSelection()
+        croppedImage = self.originalImage.crop(originalCoordinates)
+        baseName = os.path.splitext(os.path.basename(self.imagePath))[0]
+        manifestName = f"{baseName}.json"
+
+        # 檢查是否會覆寫既有檔案
+        outputNames = [manifestName] + [
+            f"{baseName}_{width}x{height}.png" for width, height in targetResolutions
+        ]
+        existingNames = [
+            name
+            for name in outputNames
+            if os.path.exists(os.path.join(exportDirectory, name))
+        ]
+        if existingNames and not messagebox.askyesno(
+            "確認",
+            "以下檔案已存在，是否覆寫？\n" + "\n".join(existingNames),
+            parent=self,
+        ):
+            return
+
+        # 以正規化座標換算各目標解析度下的 ROI，模板大小與 ROI 一致
+        x1, y1, x2, y2 = normalizedCoordinates
+        targetRois = {
+            (targetWidth, targetHeight): (
+                round(x1 * targetWidth),
+                round(y1 * targetHeight),
+                round(x2 * targetWidth),
+                round(y2 * targetHeight),
+            )
+            for targetWidth, targetHeight in targetResolutions
+        }
+        if any(roi[0] >= roi[2] or roi[1] >= roi[3] for roi in targetRois.values()):
+            messagebox.showwarning("警告", "選取區域過小，縮放後模板為空", parent=self)
+            return
+
+        # 先寫入暫存檔，全部成功後再取代正式檔案，避免留下新舊混雜的結果
+        variants = {}
+        temporaryPaths = {}
+        try:
+            for (targetWidth, targetHeight), roi in targetRois.items():
+                templateSize = (roi[2] - roi[0], roi[3] - roi[1])
+
+                resolutionKey = f"{targetWidth}x{targetHeight}"
+                templateName = f"{baseName}_{resolutionKey}.png"
+                templatePath = os.path.join(exportDirectory, templateName)
+                temporaryPaths[templatePath] = f"{templatePath}.tmp"
+                croppedImage.resize(templateSize, Image.LANCZOS).save(
+                    temporaryPaths[templatePath], format="PNG"
+                )
+
+                variants[resolutionKey] = {
+                    "template": templateName,
+                    "roi": list(roi),
+                    "scale": round(targetHeight / sourceHeight, 6),
+                }
+
+            manifest = {
+                "source": {
+                    "image": os.path.basename(self.imagePath),
+                    "resolution": [sourceWidth, sourceHeight],
+                    "roi": list(originalCoordinates),
+                },
+                "normalized": list(normalizedCoordinates),
+                "variants": variants,
+            }
+            manifestPath = os.path.join(exportDirectory, manifestName)
+            temporaryPaths[manifestPath] = f"{manifestPath}.tmp"
+            with open(temporaryPaths[manifestPath], "w", encoding="utf-8") as file:
+                json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+            # 先移除舊設定檔，確保中途失敗時不會留下與模板不符的設定檔
+            if os.path.exists(manifestPath):
+                os.remove(manifestPath)
+            for finalPath, temporaryPath in temporaryPaths.items():
+                os.replace(temporaryPath, finalPath)
+        except OSError as error:
+            for temporaryPath in temporaryPaths.values():
+                try:
+                    os.remove(temporaryPath)
+                except OSError:
+                    pass
+
+            messagebox.showerror("錯誤", f"匯出失敗，未寫入設定檔\n{error}", parent=self)
+            return
+
+        messagebox.showinfo(
+            "完成",
+            f"已匯出 {len(variants)} 種解析度至\n{exportDirectory}",
+            parent=self,
         )
 
 
-def openImageCropper(root):
+def openImageCropper(root, targetResolutions=None):
     """開啟圖片裁切器"""
     imagePath = filedialog.askopenfilename(
         parent=root,
@@ -650,7 +864,7 @@ def openImageCropper(root):
         messagebox.showwarning("警告", "未選擇圖片", parent=root)
         return
 
-    ImageCropper(root, imagePath)
+    ImageCropper(root, imagePath, targetResolutions)
 
 
 if __name__ == "__main__":